@@ -39,10 +39,10 @@ def easy_initialize_logging(
     handler = logging.StreamHandler(stream)
     handler.setFormatter(formatter)
 
-    if clear_existing:
-        logging.root.handlers.clear()
-
     root_logger = logging.getLogger()
+    # clear before adding so that the new handler is the one that survives
+    if clear_existing:
+        root_logger.handlers.clear()
     root_logger.addHandler(handler)
 
     root_logger.setLevel(log_level)
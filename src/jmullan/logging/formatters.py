@@ -2,16 +2,23 @@
 
 import abc
 import datetime
-import io
+import functools
 import json
 import logging
+import math
 import traceback
 import typing
+import warnings
 from collections.abc import Mapping
 from typing import Any
 
 import colorist  # type: ignore[import-not-found]
 
+try:
+    import orjson
+except ImportError:  # no cov
+    orjson = None  # type: ignore[assignment]
+
 from jmullan.logging.helpers import current_logging_context
 
 
@@ -21,9 +28,41 @@ class _EmptyMarker:
 
 _EMPTY = _EmptyMarker()
 _OFFSET_8 = datetime.timezone(datetime.timedelta(hours=-8))
+_MICROSECONDS = 1_000_000
 ANY = Any
 
 
+def _flatten_into(event: dict[str, Any], prefix: str, value: Mapping[str, Any]) -> None:
+    """Add the entries of a nested mapping to event under dotted keys.
+
+    Uses an explicit stack of iterators instead of recursion so that no intermediate
+    dictionaries are built and the keys keep the order they are found in.
+    """
+    stack = [(f"{prefix}.", iter(value.items()))]
+    while stack:
+        key_prefix, items = stack[-1]
+        for key, val in items:
+            if isinstance(val, Mapping):
+                stack.append((f"{key_prefix}{key}.", iter(val.items())))
+                break
+            event[f"{key_prefix}{key}"] = val
+        else:
+            stack.pop()
+
+
+def _flatten(value: dict[str, Any]) -> dict[str, Any]:
+    """Flatten a dictionary the caller owns, returning it as is if nothing is nested."""
+    if not any(isinstance(val, Mapping) for val in value.values()):
+        return value
+    top_level: dict[str, Any] = {}
+    for key, val in value.items():
+        if isinstance(val, Mapping):
+            _flatten_into(top_level, key, val)
+        else:
+            top_level[key] = val
+    return top_level
+
+
 def flatten_dict(value: Mapping[str, Any]) -> dict[str, Any]:
     """Add dots to all nested fields in dictionaries.
 
@@ -33,129 +72,195 @@ def flatten_dict(value: Mapping[str, Any]) -> dict[str, Any]:
     >>> flatten_dict({"a": {"b": 1}, "a.b": 2})
     {'a.b': 2}
     """
-    top_level = {}
-    for key, val in value.items():
-        if not isinstance(val, Mapping):
-            top_level[key] = val
-        else:
-            for sub_key, sub_value in flatten_dict(val).items():
-                top_level[f"{key}.{sub_key}"] = sub_value
-    return top_level
+    flat = _flatten(value if isinstance(value, dict) else dict(value))
+    # the caller still owns value, so never hand it back
+    return dict(flat) if flat is value else flat
+
+
+def _warn_deprecated(name: str, replacement: str) -> None:
+    """Warn the caller of a deprecated function."""
+    warnings.warn(
+        f"{name} is deprecated and no longer used by the formatters; use {replacement} instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
 
 
 def key_to_dict(key: str, value: ANY) -> dict[str, Any]:
     """Turn a dotted key and accompanying value into a dictionary.
 
-    >>> key_to_dict("key", "value")
+    Deprecated: use normalize_dict.
+    """
+    _warn_deprecated("key_to_dict", "normalize_dict")
+    return _key_to_dict(key, value)
+
+
+def _key_to_dict(key: str, value: ANY) -> dict[str, Any]:
+    """Turn a dotted key and accompanying value into a dictionary.
+
+    >>> _key_to_dict("key", "value")
     {'key': 'value'}
-    >>> key_to_dict("key.a.b", "value")
+    >>> _key_to_dict("key.a.b", "value")
     {'key': {'a': {'b': 'value'}}}
     """
     if "." not in key:
         return {key: value}
     parts = key.split(".", 1)
-    return {parts[0]: key_to_dict(parts[1], value)}
+    return {parts[0]: _key_to_dict(parts[1], value)}
 
 
-def merge_dicts(into_dict: dict[str, Any], from_dict: dict[str, Any]) -> dict[str, Any]:
-    """Turn two dicts (or other things) into one."""
-    new_dict = {}
-    if into_dict is not None:
-        new_dict.update(into_dict)
+def merge_dicts(into_dict: dict[str, Any] | None, from_dict: dict[str, Any]) -> dict[str, Any]:
+    """Turn two dicts into one, with values from the second replacing those in the first.
 
-    for key, value in from_dict.items():
-        into_value = new_dict.get(key)
-        if into_value is None:
-            new_dict[key] = value
-        elif isinstance(dict, value) and isinstance(dict, into_value):
-            new_dict[key] = merge_dicts(into_value, value)
-        else:
-            new_dict[key] = value
-    return new_dict
+    Deprecated: use normalize_dict.
+    """
+    _warn_deprecated("merge_dicts", "normalize_dict")
+    return {**(into_dict or {}), **from_dict}
 
 
 def union_keys(dx: dict[str, Any], dy: dict[str, Any]) -> list[str]:
     """Take the keys from the first dictionary and then the second dictionary, preserving order.
 
     Keys matched to a value of an empty dictionary are ignored!
+
+    Deprecated: this was only used by merge_values.
     """
-    keyholder = {x: None for x, y in dx.items() if y != {}}
+    _warn_deprecated("union_keys", "normalize_dict")
+    return _union_keys(dx, dy)
+
+
+def _union_keys(dx: dict[str, Any], dy: dict[str, Any]) -> list[str]:
+    keyholder = {x: None for x, y in dx.items() if not isinstance(y, dict) or y}
     # update maintains order
-    keyholder.update({x: None for x, y in dy.items() if y != {}})
+    keyholder.update({x: None for x, y in dy.items() if not isinstance(y, dict) or y})
     return list(keyholder.keys())
 
 
 def unflatten_dict(value: dict[str, Any]) -> dict[str, Any]:
     """Change dictionary of dotted items into a nested dictionary.
 
-    Entries with different forms of nesting update.
+    Entries with different forms of nesting are merged.
     {"a.b.c": 4} -> {"a": {"b": {"c": 4}}
     {"a.b": 2} -> {"a": {"b": 2}
+
+    Deprecated: use normalize_dict.
     """
-    top_level: dict[str, Any] = {}
-    for key, val in value.items():
-        subdict = key_to_dict(key, val)
-        top_level = merge_dicts(top_level, subdict)
-    return top_level
+    _warn_deprecated("unflatten_dict", "normalize_dict")
+    return normalize_dict(value)
 
 
-def merge_values(from_: ANY, into: ANY) -> dict | ANY | None:  # noqa: PLR0911
+def merge_values(from_: ANY, into: ANY) -> dict | ANY | None:
     """Merge deeply nested dictionary structures.
 
     In case of collisions between a dictionary and non-dictionary, the dictionary wins.
 
     If two dictionaries are merged, and a key / value pair has an empty dictionary as
     the value, it will be pruned.
+
+    Deprecated: use normalize_dict.
     """
-    match (from_, into):
-        case dict() as f, dict() as i:
-            output = {}
-            for key in union_keys(i, f):
-                value = merge_values(f.get(key, _EMPTY), i.get(key, _EMPTY))
-                if value != {}:
-                    output[key] = value
-            return output
-        case dict() as f, _:
-            return f.copy()
-        case _, dict() as i:
-            return i.copy()
-        case _EmptyMarker(), _EmptyMarker():
-            return None
-        case _EmptyMarker(), not_empty:
-            return not_empty
-        case not_empty, _EmptyMarker():
-            return not_empty
+    _warn_deprecated("merge_values", "normalize_dict")
+    return _merge_values(from_, into)
+
+
+def _merge_values(from_: ANY, into: ANY) -> dict | ANY | None:
+    from_is_dict = isinstance(from_, dict)
+    into_is_dict = isinstance(into, dict)
+    if from_is_dict and into_is_dict:
+        output = {}
+        for key in _union_keys(into, from_):
+            value = _merge_values(from_.get(key, _EMPTY), into.get(key, _EMPTY))
+            if not isinstance(value, dict) or value:
+                output[key] = value
+        return output
+    if from_is_dict:
+        return from_.copy()
+    if into_is_dict:
+        return into.copy()
+    if from_ is _EMPTY:
+        return None if into is _EMPTY else into
+    if into is _EMPTY:
+        return from_
     return from_ or into
 
 
 def de_dot(dot_string: str, value: ANY) -> tuple[str, Any]:
-    """Turn value and dotted string key into a nested dictionary."""
+    """Turn value and dotted string key into a nested dictionary.
+
+    Deprecated: use normalize_dict.
+    """
+    _warn_deprecated("de_dot", "normalize_dict")
     arr = dot_string.split(".")
     while len(arr) > 1:
         value = {arr.pop(): value}
     return arr.pop(), value
 
 
+def _dig(node: dict[str, Any], parts: list[str]) -> dict[str, Any]:
+    """Walk down a nested dictionary, replacing anything that is not a dictionary along the way."""
+    for part in parts:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = node[part] = {}
+        node = child
+    return node
+
+
+def _normalize_list(values: list, stack: list) -> list:
+    """Copy a list, queueing up any dictionaries in it to be normalized.
+
+    The copies are fresh dictionaries, so the order they are processed in does not matter.
+    """
+    normalized = []
+    for x in values:
+        if isinstance(x, dict):
+            child: dict[str, Any] = {}
+            stack.append((iter(x.items()), child))
+            normalized.append(child)
+        else:
+            normalized.append(x)
+    return normalized
+
+
 def normalize_dict(value: dict[str, Any]) -> dict[str, Any]:
-    """Expand all dotted names to nested dictionaries."""
+    """Expand all dotted names to nested dictionaries.
+
+    Each dotted key is walked part by part into a single growing output tree, using an
+    explicit stack instead of recursion. In case of collisions between a dictionary and
+    a non-dictionary, the dictionary wins. Between two non-dictionaries the later one
+    wins, even if it is falsy. Empty dictionaries are kept.
+
+    >>> normalize_dict({"a.b": 1, "a": {"c": 2}})
+    {'a': {'b': 1, 'c': 2}}
+    >>> normalize_dict({"a": {"b.c": 2}, "a.b.c": []})
+    {'a': {'b': {'c': []}}}
+    """
     if not isinstance(value, dict):
         return value
 
     output: dict[str, Any] = {}
-    for key, val in value.items():
-        normalized: Any
-        if isinstance(val, dict):
-            # dig into the dictionary to process all sub-nodes
-            normalized = normalize_dict(val)
-        elif isinstance(val, list):
-            # process all items in the list
-            normalized = [normalize_dict(x) for x in val]
+    stack = [(iter(value.items()), output)]
+    while stack:
+        items, target = stack[-1]
+        for key, val in items:
+            # now see if the key needs to get turned into levels of nesting
+            parts = key.split(".")
+            if isinstance(val, dict):
+                # dig into the dictionary to process all sub-nodes before moving on
+                stack.append((iter(val.items()), _dig(target, parts)))
+                break
+            node = _dig(target, parts[:-1])
+            if isinstance(node.get(parts[-1]), dict):
+                continue
+            if isinstance(val, list):
+                # process all items in the list
+                node[parts[-1]] = _normalize_list(val, stack)
+                if stack[-1][1] is not target:
+                    break
+            else:
+                node[parts[-1]] = val
         else:
-            normalized = val
-        # now see if the key needs to get turned into levels of nesting
-        k, v = de_dot(key, normalized)
-
-        output[k] = merge_values(v, output.get(k, _EMPTY))
+            stack.pop()
     return output
 
 
@@ -173,26 +278,57 @@ def to_z(value: datetime.datetime | None) -> str | None:
     return iso_datetime.replace("+00:00", "Z")
 
 
+@functools.lru_cache(maxsize=4)
+def _iso_second(seconds: int) -> str:
+    """Format a whole number of seconds since the epoch as an iso string, without a timezone."""
+    return datetime.datetime.fromtimestamp(seconds, datetime.UTC).replace(tzinfo=None).isoformat()
+
+
 def iso_date(record: logging.LogRecord) -> str | None:
-    """Format a datetime as an iso string, ending in Z for UTC."""
-    return to_z(datetime.datetime.fromtimestamp(record.created, datetime.UTC))
+    """Format a datetime as an iso string, ending in Z for UTC.
+
+    Records logged within the same second share the cached date and time; only the
+    microseconds are formatted per record, rounded the same way datetime.fromtimestamp does.
+    """
+    fraction, whole = math.modf(record.created)
+    seconds = int(whole)
+    microseconds = round(fraction * _MICROSECONDS)
+    if microseconds >= _MICROSECONDS:
+        seconds += 1
+        microseconds -= _MICROSECONDS
+    elif microseconds < 0:
+        seconds -= 1
+        microseconds += _MICROSECONDS
+    if microseconds:
+        return f"{_iso_second(seconds)}.{microseconds:06d}Z"
+    return f"{_iso_second(seconds)}Z"
 
 
 def render_traceback(exception_info) -> str:  # noqa: ANN001
     """Format and return the specified exception information as a string.
 
-    This default implementation just uses
-    traceback.print_exception()
+    This default implementation just joins the lines from traceback.format_tb()
     """
     if exception_info is None:
         return ""
-    sio = io.StringIO()
-    tb = exception_info[2]
-    traceback.print_tb(tb, file=sio)
-    # traceback.print_exception(ei[0], ei[1], tb, None, sio)  # noqa: ERA001
-    s = sio.getvalue()
-    sio.close()
-    return s.lstrip("\n")
+    return "".join(traceback.format_tb(exception_info[2])).lstrip("\n")
+
+
+def scalar_to_str(value: ANY) -> str | None:
+    """Render ints, finite floats and bools the way json.dumps would, without calling it.
+
+    Anything else returns None so that the caller can fall back to json.dumps.
+    >>> scalar_to_str(42), scalar_to_str(1.5), scalar_to_str(True), scalar_to_str(None)
+    ('42', '1.5', 'true', None)
+    """
+    value_type = type(value)
+    if value_type is int:
+        return int.__repr__(value)
+    if value_type is bool:
+        return "true" if value else "false"
+    if value_type is float and math.isfinite(value):
+        return float.__repr__(value)
+    return None
 
 
 # inspired by https://github.com/madzak/python-json-logger/blob/master/src/pythonjsonlogger/jsonlogger.py
@@ -223,44 +359,92 @@ RECORD_MAPPINGS = {
     "thread": "process.thread.id",
     "threadName": "process.thread.name",
 }
+_STANDARD_LOGRECORD_KEYS = frozenset(RECORD_MAPPINGS)
+# the standard fields that LogRecord may leave as None, e.g. when logging.logThreads is off
+_NULLABLE_FIELDS = ("log.origin.function", "process.thread.id", "process.thread.name", "process.name", "process.pid")
 
 
 def get_event(record: logging.LogRecord) -> dict[str, Any]:
     """Prepare a flattened dictionary from a LogRecord that includes the basic ECS fields.
 
+    Nested mappings found in the record, the logging context or the extras are flattened
+    into dotted keys in a single pass at the end, which is skipped when nothing is nested.
+
+    Record attributes that are None, for instance when logging.logThreads is off, are
+    left out; None values from the logging context or the extras are kept.
+
     Users of this library are expected to be hygienic about their use of field names.
     """
-    event = {"@timestamp": iso_date(record), "message": record.getMessage()}
-
-    for from_key, value in record.__dict__.items():
-        if value is None:
-            continue
-        if from_key in RECORD_MAPPINGS:
-            to_key = RECORD_MAPPINGS[from_key]
-            if to_key:
-                event[to_key] = value
-        else:
-            event[from_key] = value
-
-    context = current_logging_context().copy()
-    event.update(context)
+    # the standard attributes, in the order LogRecord sets them, as named by RECORD_MAPPINGS
+    event = {
+        "@timestamp": iso_date(record),
+        "message": record.__dict__.get("message") or record.getMessage(),
+        "log.logger": record.name,
+        "log.level": record.levelname,
+        "log.file.path": record.pathname,
+        "log.origin.file.name": record.filename,
+        "log.origin.file.line": record.lineno,
+        "log.origin.function": record.funcName,
+        "process.thread.id": record.thread,
+        "process.thread.name": record.threadName,
+        "process.name": record.processName,
+        "process.pid": record.process,
+    }
 
-    extra: dict = {}
-    if hasattr(record, "extra"):
-        extra = record.extra or {}
-    event.update(extra)
+    for key in _NULLABLE_FIELDS:
+        if event[key] is None:
+            del event[key]
+    event.update({k: v for k, v in record.__dict__.items() if v is not None and k not in _STANDARD_LOGRECORD_KEYS})
+    event.update(current_logging_context())
+    event.update(getattr(record, "extra", None) or {})
 
     if record.exc_info:
         exception = record.exc_info[1]
         event["error.type"] = type(exception).__name__
         event["error.message"] = str(exception)
         event["error.stack_trace"] = render_traceback(record.exc_info)
-    return flatten_dict(event)
+    # flatten only once everything is merged, so that a later value replaces a whole nested mapping
+    return _flatten(event)
+
+
+# the text formatters are just formatting the "message". LogFormatter will supply the
+# error message and traceback
+_PLAIN_SUPPRESS = frozenset({"error.type", "error.message", "error.stack_trace"})
+_CONSOLE_SUPPRESS = _PLAIN_SUPPRESS | {
+    "log.file.path",
+    "log.origin.file.name",
+    "log.origin.file.line",
+    "process.thread.id",
+    "process.thread.name",
+    "process.name",
+    "process.pid",
+    "log.origin.function",
+}
 
 
 class EasyLoggingFormatter(abc.ABC, logging.Formatter):
     """The base class for your formatter."""
 
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the specified record as text, like logging.Formatter.format.
+
+        The message is rendered once and left on the record for get_event to reuse. There is
+        no asctime, since format_message does not use a format string.
+        """
+        record.message = record.getMessage()
+        text = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if text[-1:] != "\n":
+                text = text + "\n"
+            text = text + record.exc_text
+        if record.stack_info:
+            if text[-1:] != "\n":
+                text = text + "\n"
+            text = text + self.formatStack(record.stack_info)
+        return text
+
     def formatMessage(self, record: logging.LogRecord) -> str:  # noqa: N802
         """Fulfil the logging.Formatter signature."""
         return self.format_message(record)
@@ -284,67 +468,56 @@ class ConsoleFormatter(EasyLoggingFormatter):
         logging.CRITICAL: colorist.Color.RED,
     }
 
-    def format_extra(self, value: ANY, color: colorist.Color | str | None = None) -> str:
+    # resolved once instead of for every field of every record; colorist colors are plain ANSI strings
+    _OFF: str = colorist.Color.OFF
+    _KEY_PREFIX: str = colorist.Color.GREEN
+
+    def format_extra(self, value: ANY, color: str | None = None) -> str:
         """Turn a value into a displayable string."""
         if not isinstance(value, str):
-            try:
-                value = json.dumps(value)
-            except Exception:
-                value = str(value)
+            text = scalar_to_str(value)
+            if text is not None:
+                value = text
+            else:
+                try:
+                    value = json.dumps(value)
+                except Exception:
+                    value = str(value)
         return self.colorize(value, color)
 
-    def colorize(self, value: ANY, color: colorist.Color | str | None = None) -> str:
+    def colorize(self, value: ANY, color: str | None = None) -> str:
         """Optionally wrap a value in a color."""
         if value is None or not len(value):
-            return ''
+            return ""
         if color is None:
             return f"{value}"
-        return f"{color}{value}{colorist.Color.OFF}"
+        return f"{color}{value}{self._OFF}"
 
-    def format_field(self, key: str, value: ANY) -> str | None:
-        """Format a field into a displayable string."""
+    def format_field(self, key: str, value: ANY) -> str:
+        """Format a field into a displayable string, or an empty string if there is nothing to show."""
         if key is None or value is None:
-            return None
-        k = self.format_extra(key, colorist.Color.GREEN)
+            return ""
+        if type(key) is not str:
+            key = self.format_extra(key)
         v = self.format_extra(value)
-        if not len(k) or not len(v):
-            return ''
-        return f"{k}={v}"
+        if not len(key) or not len(v):
+            return ""
+        return f"{self._KEY_PREFIX}{key}{self._OFF}={v}"
 
     def format_message(self, record: logging.LogRecord) -> str:
         """Turn a logging record into a colored message."""
         event = get_event(record)
         color = self.COLORS.get(record.levelno)
 
-        event = flatten_dict(event)
-
         timestamp = event.pop("@timestamp")
         message = event.pop("message")
 
         level = self.colorize(event.pop("log.level"), color)
         message = self.colorize(message, color)
 
-        # this method is just formatting the "message". LogFormatter will supply the
-        # error message and traceback
-        suppress_fields = {
-            "error.type",
-            "error.message",
-            "error.stack_trace",
-            "log.file.path",
-            "log.origin.file.name",
-            "log.origin.file.line",
-            "process.thread.id",
-            "process.thread.name",
-            "process.name",
-            "process.pid",
-            "log.origin.function",
-        }
-        for field in suppress_fields:
-            event.pop(field, None)
-
-        extra_pairs = [self.format_field(k, v) for k, v in event.items() if v is not None]
-        if extra_pairs:
-            pairs_string = " ".join([x for x in extra_pairs if x is not None and len(x)])
+        pairs = (self.format_field(k, v) for k, v in event.items() if v is not None and k not in _CONSOLE_SUPPRESS)
+        pairs_string = " ".join(x for x in pairs if x)
+        if pairs_string:
             message = f"{message} | {pairs_string}"
         return f"[{timestamp}] [{level}] {message}{self.reset}"
 
@@ -356,15 +529,18 @@ class PlainTextFormatter(EasyLoggingFormatter):
         """Format a key or value attached to a logging context."""
         if isinstance(value, str):
             return value
+        text = scalar_to_str(value)
+        if text is not None:
+            return text
         try:
             return json.dumps(value)
         except Exception:
             return str(value)
 
-    def format_field(self, key: str, value: object) -> str | None:
-        """Produce a string for a field."""
+    def format_field(self, key: str, value: object) -> str:
+        """Produce a string for a field, or an empty string if there is nothing to show."""
         if key is None or value is None:
-            return None
+            return ""
         k = self.format_extra(key)
         v = self.format_extra(value)
         return f"{k}={v}"
@@ -373,22 +549,14 @@ class PlainTextFormatter(EasyLoggingFormatter):
         """Turn a LogRecord into a plain text log line."""
         event = get_event(record)
 
-        event = flatten_dict(event)
-
         timestamp = event.pop("@timestamp")
         message = event.pop("message")
 
         level = event.pop("log.level")
 
-        # this method is just formatting the "message". LogFormatter will supply the
-        # error message and traceback
-        suppress_fields = {"error.type", "error.message", "error.stack_trace"}
-        for field in suppress_fields:
-            event.pop(field, None)
-
-        extra_pairs = [self.format_field(k, v) for k, v in event.items()]
-        if extra_pairs:
-            pairs_string = " ".join([x for x in extra_pairs if x is not None and len(x)])
+        pairs = (self.format_field(k, v) for k, v in event.items() if v is not None and k not in _PLAIN_SUPPRESS)
+        pairs_string = " ".join(x for x in pairs if x)
+        if pairs_string:
             message = f"{message} | {pairs_string}"
         return f"[{timestamp}] [{level}] {message}"
 
@@ -403,6 +571,32 @@ def _json_dumps_fallback(value: Any) -> str:  # noqa: ANN401
     return repr(value)
 
 
+def _stdlib_json_dumps(value: Any) -> str:  # noqa: ANN401
+    """Serialize a value to compact json with the standard library."""
+    return json.dumps(value, sort_keys=False, separators=(",", ":"), default=_json_dumps_fallback)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def json_dumps(value: Any) -> str:  # noqa: ANN401
+        """Serialize a value to compact json with orjson.
+
+        orjson refuses some things json allows, such as integers larger than 64 bits, so
+        those fall back to the standard library rather than losing the log line. Datetimes
+        and dataclasses are passed through to the same fallback json uses. Output still
+        differs from json for enums (their value rather than their repr, for plain Enum),
+        UUIDs (the bare string rather than their repr) and NaN or infinite floats (null).
+        """
+        try:
+            return orjson.dumps(value, default=_json_dumps_fallback, option=_ORJSON_OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            return _stdlib_json_dumps(value)
+
+else:
+    json_dumps = _stdlib_json_dumps
+
+
 class ECSJsonFormatter(EasyLoggingFormatter):
     """Logs a record as ECS-ish JSON using the event prepared by EasyLoggingFormatter."""
 
@@ -416,12 +610,12 @@ class ECSJsonFormatter(EasyLoggingFormatter):
         first_keys = ["@timestamp", "log.level", "message"]
 
         # extract just the keys we want to be first
-        ordered_event = {x: event.pop(x) for x in first_keys if event.get(x, _EMPTY) != _EMPTY}
+        ordered_event = {x: event.pop(x) for x in first_keys if x in event}
 
         # sort all the keys that are not the ordered first ones and normalize it
-        normalized_event = normalize_dict({x: event[x] for x in sorted(event.keys())})
+        normalized_event = normalize_dict(dict(sorted(event.items())))
 
         # add the sorted tree to the ordered fields
         ordered_event.update(normalized_event)
 
-        return json.dumps(ordered_event, sort_keys=False, separators=(",", ":"), default=_json_dumps_fallback)
+        return json_dumps(ordered_event)
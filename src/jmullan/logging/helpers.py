@@ -3,56 +3,149 @@
 import contextvars
 import inspect
 import logging
-from collections import ChainMap
-from collections.abc import Callable, Iterator
-from contextlib import contextmanager
+import weakref
+from collections.abc import Callable
+from contextlib import AbstractContextManager
 from functools import wraps
-from typing import ParamSpec, TypeVar
+from typing import Any, ParamSpec, TypeVar
 
 logger = logging.getLogger(__name__)
 
-_stack: contextvars.ContextVar[ChainMap] = contextvars.ContextVar("LoggingContext.stack")
-_stack.set(ChainMap())
+# Each logging_context sets a new flat dict holding its fields merged over its parent's, and
+# resetting the context variable on exit brings the parent back. Merging once on entry means
+# reading the context for every log record is a single dict copy, however deep the nesting.
+# The empty default is shared by every thread and task; it is only ever read, never yielded.
+_stack: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("LoggingContext.stack", default={})  # noqa: B039
 
 
+_MISSING = object()
+_signatures: weakref.WeakKeyDictionary[Callable, inspect.Signature] = weakref.WeakKeyDictionary()
+
 P = ParamSpec("P")
 R = TypeVar("R")
 
 
-def _get_stack() -> ChainMap:
-    try:
-        return _stack.get()
-    except LookupError:
-        stack = ChainMap()
-        _stack.set(stack)
-        return stack
-
-
 def current_logging_context() -> dict:
-    """Get a copy of the current logging context."""
-    return dict(_get_stack().copy())
+    """Get a copy of the current logging context.
+
+    The result is a new dictionary, so callers may read or update it without copying it again.
+    """
+    return _stack.get().copy()
 
 
-@contextmanager
-def logging_context(**kwargs) -> Iterator[ChainMap]:
+def logging_context(**kwargs) -> AbstractContextManager[dict[str, Any]]:
     """Add fields to logging context.
 
     For single logging lines use logging.level(message, extra={'x': 1})
 
+    The yielded dict holds all the fields of the context, including those inherited from
+    enclosing contexts. Changes to it show up in log records until the context exits.
     """
-    token = None
-    try:
-        child = _get_stack().new_child(kwargs)
-        token = _stack.set(child)
-        yield child
-    finally:
+    return _LoggingContext(kwargs)
+
+
+class _LoggingContext:
+    """Do the work of logging_context, taking the fields as a dict that may be reused.
+
+    This is a plain class rather than a @contextmanager generator because it is entered on
+    every call to a function decorated with logging_context_from_args.
+    """
+
+    __slots__ = ("fields", "token")
+
+    def __init__(self, fields: dict[str, Any]):
+        self.fields = fields
+        self.token: contextvars.Token | None = None
+
+    def __enter__(self) -> dict[str, Any]:
+        child = {**_stack.get(), **self.fields}
+        self.token = _stack.set(child)
+        return child
+
+    def __exit__(self, *exc_info: object) -> None:
+        token = self.token
+        if token is None:
+            return
+        self.token = None
         try:
-            if token is not None:
-                _stack.reset(token)
-        except Exception:
+            _stack.reset(token)
+        except ValueError:
+            # the token came from another contextvars.Context, e.g. exiting in a different task
             logger.exception("Could not reset logging context")
 
 
+class _ArgumentsContext(_LoggingContext):
+    """Add a decorated function's arguments to the logging context, unless they are already there.
+
+    The context dict is never handed to the decorated function, so when every field is already
+    set to the very same object the enclosing context can be left in place.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> dict[str, Any]:
+        current = _stack.get()
+        fields = self.fields
+        if fields and all(current.get(k, _MISSING) is v for k, v in fields.items()):
+            return current
+        return super().__enter__()
+
+
+def _argument_getter(signature: inspect.Signature, names: set[str]) -> Callable[[tuple, dict], dict[str, Any]]:
+    """Build a function that picks the named parameters out of a call's args and kwargs.
+
+    Where each parameter can come from is worked out once from the signature, so calls do
+    not need to be bound. Parameters that were not passed and have no default are left out.
+    """
+    named_keywords = frozenset(
+        name
+        for name, parameter in signature.parameters.items()
+        if parameter.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    )
+    lookups = tuple(
+        (name, parameter.kind, position, parameter.default)
+        for position, (name, parameter) in enumerate(signature.parameters.items())
+        if name in names
+    )
+
+    def get_arguments(args: tuple, kwargs: dict) -> dict[str, Any]:
+        arguments = {}
+        for name, kind, position, default in lookups:
+            if kind is inspect.Parameter.POSITIONAL_OR_KEYWORD:
+                if name in kwargs:
+                    value = kwargs[name]
+                else:
+                    value = args[position] if position < len(args) else default
+            elif kind is inspect.Parameter.KEYWORD_ONLY:
+                value = kwargs.get(name, default)
+            elif kind is inspect.Parameter.POSITIONAL_ONLY:
+                value = args[position] if position < len(args) else default
+            elif kind is inspect.Parameter.VAR_POSITIONAL:
+                value = args[position:]
+            else:
+                value = {x: y for x, y in kwargs.items() if x not in named_keywords}
+            if value is not inspect.Parameter.empty:
+                arguments[name] = value
+        return arguments
+
+    return get_arguments
+
+
+def _cached_signature(function: Callable) -> inspect.Signature:
+    """Get the signature of a function, inspecting each function only once.
+
+    Functions are held weakly, and anything that cannot be weakly referenced is just inspected.
+    """
+    try:
+        return _signatures[function]
+    except KeyError:
+        pass
+    except TypeError:
+        return inspect.signature(function)
+    signature = _signatures[function] = inspect.signature(function)
+    return signature
+
+
 def logging_context_from_args(*intercept_args) -> Callable:
     """Decorate a method with this in order to add specific arguments to the logging context.
 
@@ -74,36 +167,34 @@ def logging_context_from_args(*intercept_args) -> Callable:
             )
             return function
 
-        signature = inspect.signature(function)
-        valid_parameters = {x for x in intercept_args if x in signature.parameters}
-        invalid_parameters = {x for x in intercept_args if x not in signature.parameters}
-        if invalid_parameters:
-            logger.error(
-                "Invalid parameters %s were attempted to be attached to the logging context"
-                " that are not in the given function's signature %s(%s)",
-                invalid_parameters,
-                function.__name__,
-                ", ".join(signature.parameters.keys()),
-            )
+        signature = _cached_signature(function)
+        requested_parameters = set(intercept_args)
+        valid_parameters = requested_parameters & signature.parameters.keys()
         if not valid_parameters:
             logger.error(
                 "None of the parameters %s you are trying to attach to the logging context"
                 " are in the given function's signature %s(%s)",
-                set(intercept_args),
+                requested_parameters,
                 function.__name__,
-                ", ".join(signature.parameters.keys()),
+                ", ".join(signature.parameters),
             )
             return function
+        invalid_parameters = requested_parameters - valid_parameters
+        if invalid_parameters:
+            logger.error(
+                "Invalid parameters %s were attempted to be attached to the logging context"
+                " that are not in the given function's signature %s(%s)",
+                invalid_parameters,
+                function.__name__,
+                ", ".join(signature.parameters),
+            )
+
+        get_arguments = _argument_getter(signature, valid_parameters)
 
         @wraps(function)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            try:
-                bound_arguments = signature.bind(*args, **kwargs)
-                bound_arguments.apply_defaults()
-                context = {x: y for x, y in bound_arguments.arguments.items() if x in valid_parameters}
-            except Exception:
-                context = {}
-            with logging_context(**context):
+            # a call that does not match the signature will raise from the function itself
+            with _ArgumentsContext(get_arguments(args, kwargs)):
                 return function(*args, **kwargs)
 
         return wrapper
@@ -0,0 +1,23 @@
+import io
+import logging
+
+from jmullan.logging import formatters
+from jmullan.logging.easy_logging import easy_initialize_logging
+
+
+def test_easy_initialize_logging_keeps_new_handler():
+    root_logger = logging.getLogger()
+    old_handlers = root_logger.handlers[:]
+    old_level = root_logger.level
+    stream = io.StringIO()
+    try:
+        root_logger.addHandler(logging.NullHandler())
+        easy_initialize_logging("DEBUG", stream=stream)
+        assert len(root_logger.handlers) == 1
+        assert isinstance(root_logger.handlers[0].formatter, formatters.ECSJsonFormatter)
+        logging.getLogger("jmullan.test").debug("hello")
+        assert '"message":"hello"' in stream.getvalue()
+    finally:
+        root_logger.handlers[:] = old_handlers
+        root_logger.setLevel(old_level)
+        logging.captureWarnings(False)
@@ -1,19 +1,30 @@
+import dataclasses
+import datetime
+import json
+import logging
+import sys
+
 import pytest
 
-from jmullan.logging import formatters
+from jmullan.logging import formatters, helpers
 
 
 def test_flatten_dict():
     assert formatters.flatten_dict({"a": "b", "c": {"d": "e"}}) == {"a": "b", "c.d": "e"}
     assert formatters.flatten_dict({"a.b": "c", "a.b.d": "e"}) == {"a.b": "c", "a.b.d": "e"}
     assert formatters.flatten_dict({"a": {"b": 1}, "a.b": 2}) == {"a.b": 2}
+    flat = {"a": 1, "b.c": 2}
+    assert formatters.flatten_dict(flat) == flat
+    assert formatters.flatten_dict(flat) is not flat
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_union_keys():
     assert formatters.union_keys({"a": "b", "c": "d"}, {}) == ["a", "c"]
     assert formatters.union_keys({"a": "b", "c": "d"}, {"e": "f"}) == ["a", "c", "e"]
     assert formatters.union_keys({}, {"e": "f"}) == ["e"]
     assert formatters.union_keys({"a": "b", "c": {}}, {"e": "f"}) == ["a", "e"]
+    assert formatters.union_keys({"a": 0, "c": []}, {"e": "", "g": {}}) == ["a", "c", "e"]
     assert formatters.union_keys({"a": "b", "c": "d"}, {"e": "f", "g": None}) == [
         "a",
         "c",
@@ -30,8 +41,10 @@ def test_union_keys():
         ({"a": "b"}, {"c": "d"}, {"c": "d", "a": "b"}),
         ({"a": "b"}, {"a": {}}, {}),
         ({"a": "b"}, {"a": {"c": "d"}}, {"a": {"c": "d"}}),
+        ({"a": 0, "b": {}}, {"d": ""}, {"d": "", "a": 0}),
     ],
 )
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_merge_values(from_, into, expected):
     assert expected == formatters.merge_values(from_, into)
 
@@ -40,6 +53,7 @@ def test_merge_values(from_, into, expected):
     ("dot_string", "value", "expected"),
     [("a.b.c", "e", ("a", {"b": {"c": "e"}})), ("a.b", 2, ("a", {"b": 2})), ("a", "b", ("a", "b"))],
 )
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_de_dot(dot_string, value, expected):
     assert expected == formatters.de_dot(dot_string, value)
     assert formatters.de_dot("a.b.c", "e") == ("a", {"b": {"c": "e"}})
@@ -53,6 +67,42 @@ def test_normalize_dict():
     assert formatters.normalize_dict({"a.b": "c", "a.b.d": "e"}) == {"a": {"b": {"d": "e"}}}
     assert formatters.normalize_dict({"a.b": [1, 2, 3]}) == {"a": {"b": [1, 2, 3]}}
     assert formatters.normalize_dict({"a.b": [1, 2, {"c.d": "e"}]}) == {"a": {"b": [1, 2, {"c": {"d": "e"}}]}}
+    assert formatters.normalize_dict({"a": {"b": 1}, "a.b": 2}) == {"a": {"b": 2}}
+    assert formatters.normalize_dict({"a.b": {"c": 1}, "a": {"b.d": 2}}) == {"a": {"b": {"c": 1, "d": 2}}}
+
+
+def test_normalize_dict_keeps_empty_dicts_and_later_values():
+    assert formatters.normalize_dict({"a": {"b": 1}, "a.b": {}, "a.c": {}}) == {"a": {"b": {}, "c": {}}}
+    assert formatters.normalize_dict({"a": {"b.c": 2}, "a.b.c": []}) == {"a": {"b": {"c": []}}}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_merge_dicts():
+    assert formatters.merge_dicts(None, {"a": 1}) == {"a": 1}
+    assert formatters.merge_dicts({"a": 1, "b": 2}, {"a": 3}) == {"a": 3, "b": 2}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_unflatten_dict():
+    assert formatters.unflatten_dict({"a.b.c": 4}) == {"a": {"b": {"c": 4}}}
+    assert formatters.unflatten_dict({"a.b": 2, "c": 3}) == {"a": {"b": 2}, "c": 3}
+    assert formatters.unflatten_dict({"a.b": 1, "a.c": 2}) == {"a": {"b": 1, "c": 2}}
+
+
+@pytest.mark.parametrize(
+    ("function", "args"),
+    [
+        (formatters.key_to_dict, ("a.b", 1)),
+        (formatters.union_keys, ({}, {})),
+        (formatters.merge_values, ({}, {})),
+        (formatters.de_dot, ("a.b", 1)),
+        (formatters.merge_dicts, ({}, {})),
+        (formatters.unflatten_dict, ({},)),
+    ],
+)
+def test_deprecated_helpers_warn(function, args):
+    with pytest.deprecated_call():
+        function(*args)
 
 
 def test_format_json():
@@ -71,3 +121,175 @@ def test_format_json():
     }
     expected = '{"@timestamp":"anything","log.level":"INFO","message":"something","d":{"a":"c","e":"f"}}'
     assert jf.format_json(event) == expected
+
+
+def _make_record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord("jmullan.test", logging.INFO, "test.py", 12, "hello %s", ("world",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_get_event_flattens_nested_values():
+    record = _make_record(http={"request": {"method": "GET"}, "status": 200}, extra={"a": {"b": "c"}})
+    with helpers.logging_context(user={"id": 1}):
+        event = formatters.get_event(record)
+    assert event["message"] == "hello world"
+    assert event["log.logger"] == "jmullan.test"
+    assert event["http.request.method"] == "GET"
+    assert event["http.status"] == 200
+    assert event["user.id"] == 1
+    assert event["a.b"] == "c"
+    assert event == formatters.flatten_dict(event)
+
+
+def test_format_json_skips_empty_fields():
+    record = _make_record(nothing=None)
+    event = formatters.get_event(record)
+    assert "log.origin.function" not in event
+    assert "nothing" not in event
+    output = formatters.ECSJsonFormatter().format_json(event)
+    assert '"function"' not in output
+    assert '"nothing"' not in output
+    assert '"line":12' in output
+
+
+def test_format_json_keeps_none_context_and_extra_values():
+    record = _make_record(extra={"session": None})
+    with helpers.logging_context(user=None):
+        output = formatters.ECSJsonFormatter().format(record)
+    assert '"user":null' in output
+    assert '"session":null' in output
+
+
+def test_console_format_field():
+    cf = formatters.ConsoleFormatter()
+    assert cf.format_field("a", "b") == "\x1b[32ma\x1b[0m=b"
+    assert cf.format_field("a", {"b": 1}) == '\x1b[32ma\x1b[0m={"b": 1}'
+    assert cf.format_field("a", "") == ""
+    assert cf.format_field(1, "x") == "\x1b[32m1\x1b[0m=x"
+    assert cf.format_field("a", None) == ""
+
+
+def test_json_dumps():
+    assert formatters.json_dumps({"a": [1, "b"], "c": None}) == '{"a":[1,"b"],"c":null}'
+    assert formatters.json_dumps({"big": 2**70}) == '{"big":1180591620717411303424}'
+    assert formatters.json_dumps({"thing": object}) == '{"thing":"<class \'object\'>"}'
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+    y: int
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        datetime.datetime(2020, 12, 12, 12, 12, 12, tzinfo=datetime.UTC),
+        datetime.date(2020, 12, 12),
+        datetime.time(12, 12),
+        _Point(1, 2),
+        {"a": {1: "b"}, "c": [1.5, None, True]},
+        2**70,
+    ],
+)
+def test_json_dumps_matches_stdlib(value):
+    expected = json.dumps({"value": value}, separators=(",", ":"), default=repr)
+    assert formatters.json_dumps({"value": value}) == expected
+
+
+@pytest.mark.parametrize("value", [0, -12, 2**70, 1.5, 1e300, float("nan"), float("-inf"), True, False, None, "a"])
+def test_text_format_extra_matches_json(value):
+    expected = value if isinstance(value, str) else json.dumps(value)
+    assert formatters.PlainTextFormatter().format_extra(value) == expected
+    assert formatters.ConsoleFormatter().format_extra(value) == expected
+
+
+@pytest.mark.parametrize(
+    ("created", "expected"),
+    [
+        (1607775132, "2020-12-12T12:12:12Z"),
+        (1607775132.25, "2020-12-12T12:12:12.250000Z"),
+        (1607775132.9999999, "2020-12-12T12:12:13Z"),
+    ],
+)
+def test_iso_date(created, expected):
+    record = _make_record()
+    record.created = created
+    assert formatters.iso_date(record) == expected
+    assert formatters.iso_date(record) == formatters.to_z(datetime.datetime.fromtimestamp(created, datetime.UTC))
+
+
+def test_render_traceback():
+    assert formatters.render_traceback(None) == ""
+    try:
+        raise ValueError("oops")
+    except ValueError:
+        exc_info = sys.exc_info()
+    rendered = formatters.render_traceback(exc_info)
+    assert rendered.startswith('  File "')
+    assert 'raise ValueError("oops")' in rendered
+
+
+def test_plain_text_format_message():
+    ptf = formatters.PlainTextFormatter()
+    record = _make_record(func=None)
+    record.created = 1607775132
+    record.thread = record.threadName = record.process = record.processName = None
+    assert ptf.format_message(record) == (
+        "[2020-12-12T12:12:12Z] [INFO] hello world | log.logger=jmullan.test"
+        " log.file.path=test.py log.origin.file.name=test.py log.origin.file.line=12"
+    )
+    with helpers.logging_context(user="me"):
+        assert ptf.format_message(record).endswith(" log.origin.file.line=12 user=me")
+
+
+def test_console_format_message():
+    cf = formatters.ConsoleFormatter()
+    record = _make_record()
+    record.created = 1607775132
+    assert cf.format_message(record) == (
+        "[2020-12-12T12:12:12Z] [\x1b[97mINFO\x1b[0m] \x1b[97mhello world\x1b[0m"
+        " | \x1b[32mlog.logger\x1b[0m=jmullan.test\x1b[0m"
+    )
+
+
+def test_console_format_message_with_non_str_key():
+    cf = formatters.ConsoleFormatter()
+    record = _make_record(extra={1: "x"})
+    record.created = 1607775132
+    assert " \x1b[32m1\x1b[0m=x" in cf.format_message(record)
+
+
+def test_format_uses_format_message_override():
+    class PrefixedFormatter(formatters.PlainTextFormatter):
+        def formatMessage(self, record):  # noqa: N802
+            return "prefix " + super().formatMessage(record)
+
+    assert PrefixedFormatter().format(_make_record()).startswith("prefix ")
+
+
+def test_format_matches_logging_formatter():
+    try:
+        raise ValueError("oops")
+    except ValueError:
+        exc_info = sys.exc_info()
+    for formatter in (formatters.PlainTextFormatter(), formatters.ConsoleFormatter(), formatters.ECSJsonFormatter()):
+        stack_info = "Stack (most recent call last):\n  here"
+        record = _make_record(exc_info=exc_info, stack_info=stack_info, created=1607775132)
+        expected = logging.Formatter.format(
+            formatter, _make_record(exc_info=exc_info, stack_info=stack_info, created=1607775132)
+        )
+        assert formatter.format(record) == expected
+        assert record.message == "hello world"
+
+
+def test_get_event_later_values_replace_nested_values():
+    record = _make_record(http={"status": 200}, user="me")
+    with helpers.logging_context(http="overridden", user={"id": 1}):
+        event = formatters.get_event(record)
+    assert event["http"] == "overridden"
+    assert "http.status" not in event
+    assert event["user.id"] == 1
+    assert "user" not in event
+    assert '"http":"overridden"' in formatters.ECSJsonFormatter().format_json(event)
@@ -1,4 +1,8 @@
+import contextvars
 import logging
+import threading
+
+import pytest
 
 from jmullan.logging import helpers
 
@@ -47,3 +51,138 @@ def test_log_stack():
     element("a")
     element(fire="a")
     element(None, water="b")
+
+
+@helpers.logging_context_from_args("a", "b", "rest", "c", "options")
+def every_kind(a, /, b=2, *rest, c=3, **options):
+    return helpers.current_logging_context()
+
+
+def test_logging_context_from_args_kinds():
+    assert every_kind(1) == {"a": 1, "b": 2, "rest": (), "c": 3, "options": {}}
+    assert every_kind(1, 5) == {"a": 1, "b": 5, "rest": (), "c": 3, "options": {}}
+    assert every_kind(1, b=5) == {"a": 1, "b": 5, "rest": (), "c": 3, "options": {}}
+    assert every_kind(1, 5, 6, 7, c=8, d=9) == {"a": 1, "b": 5, "rest": (6, 7), "c": 8, "options": {"d": 9}}
+    # the same shape of call again, with different values
+    assert every_kind(2, 6, 7, 8, c=9, d=10) == {"a": 2, "b": 6, "rest": (7, 8), "c": 9, "options": {"d": 10}}
+    assert every_kind(1, a=2) == {"a": 1, "b": 2, "rest": (), "c": 3, "options": {"a": 2}}
+    assert helpers.current_logging_context() == {}
+
+
+def test_logging_context_from_args_bad_call():
+    with pytest.raises(TypeError):
+        every_kind()
+    assert helpers.current_logging_context() == {}
+
+
+def test_nested_contexts_merge():
+    with helpers.logging_context(a=1, b=2) as outer:
+        with helpers.logging_context(b=3, c=4) as inner:
+            assert inner == {"a": 1, "b": 3, "c": 4}
+            assert helpers.current_logging_context() == {"a": 1, "b": 3, "c": 4}
+            context = helpers.current_logging_context()
+            context["d"] = 5
+            assert "d" not in helpers.current_logging_context()
+        assert outer == {"a": 1, "b": 2}
+        assert helpers.current_logging_context() == {"a": 1, "b": 2}
+    assert helpers.current_logging_context() == {}
+
+
+def test_repeated_context_is_not_shared():
+    with helpers.logging_context(retry=1) as outer:
+        with helpers.logging_context(retry=1) as inner:
+            assert inner is not outer
+            inner["step"] = "inner"
+        with helpers.logging_context(other=None) as inner:
+            assert inner == {"retry": 1, "other": None}
+        assert helpers.current_logging_context() == {"retry": 1}
+    with helpers.logging_context() as empty:
+        empty["x"] = 1
+    assert helpers.current_logging_context() == {}
+
+
+@helpers.logging_context_from_args("request_id")
+def handle(request_id):
+    return helpers.current_logging_context()
+
+
+def test_repeated_arguments_context():
+    request_id = "abc"
+    with helpers.logging_context(request_id=request_id):
+        assert handle(request_id) == {"request_id": "abc"}
+        assert handle("def") == {"request_id": "def"}
+        assert helpers.current_logging_context() == {"request_id": "abc"}
+
+
+def test_signature_is_inspected_once(mocker):
+    def target(foo, bar=None):
+        return helpers.current_logging_context()
+
+    spy = mocker.spy(helpers.inspect, "signature")
+    first = helpers.logging_context_from_args("foo")(target)
+    second = helpers.logging_context_from_args("bar")(target)
+    assert spy.call_count == 1
+    assert first("a") == {"foo": "a"}
+    assert second("a", "b") == {"bar": "b"}
+    assert helpers.logging_context_from_args("x")(len) is len
+
+
+def test_context_resets_on_exception():
+    def fail():
+        with helpers.logging_context(a=1):
+            assert helpers.current_logging_context() == {"a": 1}
+            raise ValueError("oops")
+
+    with pytest.raises(ValueError, match="oops"):
+        fail()
+    assert helpers.current_logging_context() == {}
+
+
+def test_context_is_per_thread():
+    seen = []
+    with helpers.logging_context(a=1):
+        thread = threading.Thread(target=lambda: seen.append(helpers.current_logging_context()))
+        thread.start()
+        thread.join()
+    assert seen == [{}]
+
+
+@helpers.logging_context_from_args("a", "c")
+def required_keyword(a=1, /, *, c):
+    return helpers.current_logging_context()
+
+
+def test_logging_context_from_args_defaults():
+    assert required_keyword(c=2) == {"a": 1, "c": 2}
+    assert required_keyword(5, c=2) == {"a": 5, "c": 2}
+
+
+def test_context_exited_in_another_context(mocker):
+    log_exception = mocker.patch.object(helpers.logger, "exception")
+
+    def enter_here_exit_elsewhere():
+        manager = helpers.logging_context(a=1)
+        manager.__enter__()
+        contextvars.copy_context().run(manager.__exit__, None, None, None)
+        return helpers.current_logging_context()
+
+    assert contextvars.copy_context().run(enter_here_exit_elsewhere) == {"a": 1}
+    log_exception.assert_called_once_with("Could not reset logging context")
+    assert helpers.current_logging_context() == {}
+
+
+def test_logging_context_from_args_errors(mocker):
+    log_error = mocker.patch.object(helpers.logger, "error")
+
+    def target(foo, bar=None):
+        return helpers.current_logging_context()
+
+    assert helpers.logging_context_from_args("nope")(target) is target
+    assert log_error.call_count == 1
+    assert log_error.call_args.args[1:] == ({"nope"}, "target", "foo, bar")
+
+    log_error.reset_mock()
+    decorated = helpers.logging_context_from_args("foo", "nope")(target)
+    assert log_error.call_count == 1
+    assert log_error.call_args.args[1:] == ({"nope"}, "target", "foo, bar")
+    assert decorated("a") == {"foo": "a"}